@@ -1,12 +1,17 @@
 import streamlit as st
 
 # (Optional) global galaxy CSS, safe to keep
-st.markdown("""
+GALAXY_CSS = """
 <style>
 .stApp { background: radial-gradient(circle at top left,#0b0c10,#1f2833,#0b0c10); color: white; }
 h1 { color: white !important; } h2,h3,h4 { color: #FFD700 !important; }
+/* skip the full-viewport gradient repaint on phones / reduced-motion sessions */
+@media (max-width: 768px), (prefers-reduced-motion: reduce) { .stApp { background: #0b0c10; } }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit drops any element a rerun doesn't re-emit, so this must run every time
+st.markdown(GALAXY_CSS, unsafe_allow_html=True)
 
 from dashboard_tab import render_dashboard
 from automation_tab import render_automation_tab  # your 'Crystal Ball' tab
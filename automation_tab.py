@@ -1,57 +1,197 @@
+import io
 import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-import yaml
-import yfinance as yf
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from config import fmt_usd
+from file_cache import FileCache
+
+T = TypeVar("T")
 
 # ---------- Caching helpers ----------
-@st.cache_data(ttl=300)
-def _history(ticker: str, period="6mo", interval="1d") -> pd.DataFrame:
+# st.cache_data is per-process; the file cache underneath survives restarts
+# and serves stale entries while refreshing them in the background.
+_FILE_CACHE = FileCache()
+
+# One yf.Ticker per symbol per process, so yfinance's lazy per-ticker state is reused
+_TICKER_CACHE: Dict[str, "yf.Ticker"] = {}
+
+def _ticker(symbol: str) -> "yf.Ticker":
+    t = _TICKER_CACHE.get(symbol)
+    if t is None:
+        import yfinance as yf  # deferred so importing this module stays cheap
+
+        t = _TICKER_CACHE.setdefault(symbol, yf.Ticker(symbol))
+    return t
+
+def _fetch_history_json(ticker: str, period: str, interval: str) -> Optional[str]:
     try:
-        df = yf.Ticker(ticker).history(period=period, interval=interval)
-        if df is None or df.empty:
-            return pd.DataFrame()
-        df = df.rename(columns=str.lower)
-        return df
+        df = _ticker(ticker).history(period=period, interval=interval)
     except Exception:
-        return pd.DataFrame()
+        return None
+    if df is None or df.empty:
+        return None
+    return df.to_json(orient="split", date_format="iso")
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _history_cached(ticker: str, period: str, interval: str) -> Tuple[pd.DataFrame, bool]:
+    payload, fresh = _FILE_CACHE.fetch(
+        ticker, "history", {"period": period, "interval": interval},
+        lambda: _fetch_history_json(ticker, period, interval),
+    )
+    if not payload:
+        return pd.DataFrame(), True
+    try:
+        df = pd.read_json(io.StringIO(payload), orient="split")
+    except ValueError:
+        return pd.DataFrame(), True
+    return df.rename(columns=str.lower), fresh
+
+def _history_entry(ticker: str, period="6mo", interval="1d") -> Tuple[pd.DataFrame, bool]:
+    df, fresh = _history_cached(ticker, period, interval)
+    if not fresh:
+        # a stale disk entry is refreshing in the background; don't pin it for the ttl
+        _history_cached.clear(ticker, period, interval)
+    return df, fresh
+
+def _history(ticker: str, period="6mo", interval="1d") -> pd.DataFrame:
+    return _history_entry(ticker, period, interval)[0]
+
+# Yahoo rejects very long symbol lists in one quote URL, so batch in chunks
+_YF_BATCH = 20
+
+def _download_last_close(tickers: Tuple[str, ...]) -> Dict[str, float]:
+    import yfinance as yf
+
+    prices = {}
+    for i in range(0, len(tickers), _YF_BATCH):
+        chunk = tickers[i:i + _YF_BATCH]
+        try:
+            df = yf.download(tickers=" ".join(chunk), period="1d", group_by="ticker",
+                             threads=True, progress=False)
+        except Exception:
+            continue
+        if df is None or df.empty:
+            continue
+        for t in chunk:
+            try:
+                px = df[t]["Close"] if isinstance(df.columns, pd.MultiIndex) else df["Close"]
+                px = px.dropna()
+                if len(px):
+                    prices[t] = float(px.to_numpy()[-1])
+            except Exception:
+                continue
+    return prices
+
+def _store_last_close(prices: Dict[str, float]) -> None:
+    for t, px in prices.items():
+        _FILE_CACHE.store(t, "last_close", {}, px)
 
 @st.cache_data(ttl=300)
+def _bulk_last_close_cached(tickers: Tuple[str, ...]) -> Tuple[Dict[str, float], Tuple[str, ...]]:
+    prices, missing, stale = {}, [], []
+    for t in tickers:
+        hit = _FILE_CACHE.lookup(t, "last_close", {})
+        if hit is None:
+            missing.append(t)
+            continue
+        prices[t], fresh = hit
+        if not fresh:
+            stale.append(t)
+
+    if stale:
+        stale_key = tuple(stale)
+        _FILE_CACHE.revalidate(("last_close",) + stale_key,
+                               lambda: _store_last_close(_download_last_close(stale_key)))
+    if missing:
+        fetched = _download_last_close(tuple(missing))
+        _store_last_close(fetched)
+        prices.update(fetched)
+
+    return {t: float(prices.get(t) or 0.0) for t in tickers}, tuple(stale)
+
+def _bulk_last_close(tickers: Tuple[str, ...]) -> Tuple[Dict[str, float], Tuple[str, ...]]:
+    """Last closes plus the symbols that were served stale from the file cache."""
+    prices, stale = _bulk_last_close_cached(tickers)
+    if stale:
+        # same as _history_entry: re-read the disk cache next run instead of pinning stale prices
+        _bulk_last_close_cached.clear(tickers)
+    return prices, stale
+
 def _get_stock_price(ticker: str) -> float:
-    try:
-        px = yf.Ticker(ticker).history(period="1d")["Close"]
-        return float(px.iloc[-1]) if len(px) else 0.0
-    except Exception:
-        return 0.0
+    # single-ticker wrapper kept for back-compat
+    return _bulk_last_close((ticker,))[0].get(ticker, 0.0)
 
 # If your app.py already has get_crypto_price / get_stock_price, you can import and use those instead.
 
+# ---------- Concurrency ----------
+# Yahoo fetches are network-bound, so overlapping them in threads helps;
+# for a handful of tickers the pool setup costs more than it saves.
+_MAX_WORKERS = 8
+_PARALLEL_MIN = 4
+
+def _map_tickers(fn: Callable[[str], T], tickers: List[str]) -> List[T]:
+    if len(tickers) <= _PARALLEL_MIN:
+        return [fn(t) for t in tickers]
+    # workers need the ctx for st.cache_data; they must not draw elements (no
+    # cache spinners), so callers wrap this in one st.spinner on the script thread
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(
+        max_workers=_MAX_WORKERS,
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+    ) as ex:
+        return list(ex.map(fn, tickers))
+
 # ---------- Simple indicators ----------
-def _sma(series: pd.Series, window: int) -> float:
-    if len(series) < window:
+# Both take the close column as a raw float array.
+def _sma(close: np.ndarray, window: int) -> float:
+    if len(close) < window:
         return float("nan")
-    return float(series.rolling(window).mean().iloc[-1])
+    return float(close[-window:].mean())
 
-def _rsi(series: pd.Series, window: int = 14) -> float:
-    if len(series) < window + 1:
+def _rsi(close: np.ndarray, window: int = 14) -> float:
+    # Wilder RSI: seed with the first `window` deltas, then smooth
+    # avg = (avg * (w - 1) + x) / w over the rest in a single pass
+    close = close[~np.isnan(close)]
+    if len(close) < window + 1:
         return 50.0
-    delta = series.diff()
-    up = delta.clip(lower=0.0)
-    down = (-delta).clip(lower=0.0)
-    roll_up = up.rolling(window).mean()
-    roll_down = down.rolling(window).mean().replace(0, 1e-9)
-    rs = roll_up / roll_down
-    return float(100.0 - (100.0 / (1.0 + rs.iloc[-1])))
+    delta = np.diff(close)
+    up = np.clip(delta, 0.0, None)
+    down = np.clip(-delta, 0.0, None)
+    avg_up = float(up[:window].mean())
+    avg_down = float(down[:window].mean())
+    for u, d in zip(up[window:].tolist(), down[window:].tolist()):
+        avg_up = (avg_up * (window - 1) + u) / window
+        avg_down = (avg_down * (window - 1) + d) / window
+    return float(100.0 - (100.0 / (1.0 + avg_up / max(avg_down, 1e-9))))
 
 # ---------- Load SOP ----------
+STRATEGY_PATH = "strategy.yaml"
+
+@st.cache_data
+def _load_strategy_cached(path: str, mtime: float) -> dict:
+    import yaml
+
+    # libyaml's C loader when PyYAML was built with it, else the pure-Python one
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=loader) or {}
+
 def _load_strategy() -> dict:
-    with open("strategy.yaml", "r") as f:
-        return yaml.safe_load(f) or {}
+    # mtime in the cache key re-parses only after strategy.yaml is edited
+    return _load_strategy_cached(STRATEGY_PATH, os.path.getmtime(STRATEGY_PATH))
 
 # ---------- Signals ----------
+@lru_cache(maxsize=512)
 def _key_for(t: str) -> str:
     # map 'ES=F' -> 'es_f', 'BTC-USD' -> 'btc_usd'
     return t.lower().replace("=", "_").replace("-", "_")
@@ -61,7 +201,13 @@ def _signal_for(ticker: str, rules: dict) -> dict:
     if df.empty or "close" not in df:
         return {"ticker": ticker, "action": "HOLD", "confidence": 0.0, "reason": "no data"}
 
-    close = df["close"]
+    close = df["close"].to_numpy(dtype=float)
+    # last close + bar count fingerprint the history, so idle reruns skip the indicators
+    return _signal_cached(ticker, rules, float(close[-1]), len(close))
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _signal_cached(ticker: str, rules: dict, last_px: float, n_bars: int) -> dict:
+    close = _history(ticker)["close"].to_numpy(dtype=float)
     score = 0
     reasons = []
 
@@ -70,7 +216,7 @@ def _signal_for(ticker: str, rules: dict) -> dict:
         if t == "price_above_sma":
             w = int(cond["window"])
             sma = _sma(close, w)
-            if not math.isnan(sma) and close.iloc[-1] > sma:
+            if not math.isnan(sma) and close[-1] > sma:
                 score += 1
                 reasons.append(f"price>{w}SMA")
         elif t == "rsi_below":
@@ -99,29 +245,28 @@ def _position_targets(
     total_deploy = max(0.0, cash_on_hand)
     alloc_long = total_deploy * (long_term_pct / 100.0)
 
-    target = {t: alloc_long * (weights.get(t, 0.0)) for t in weights.keys()}
+    tickers = list(weights.keys())
+    n = len(tickers)
+    w = np.fromiter((float(weights.get(t, 0.0) or 0.0) for t in tickers), dtype=float, count=n)
+    px = np.fromiter((float(prices.get(t, 0.0) or 0.0) for t in tickers), dtype=float, count=n)
+    cur_val = np.fromiter((float(current_values.get(t, 0.0) or 0.0) for t in tickers), dtype=float, count=n)
 
     max_pos_val = float(risk.get("max_position_pct", 0.25)) * max(1.0, portfolio_value)
     max_buy = float(risk.get("max_buy_usd", 2500))
     min_cash_reserve = float(risk.get("min_cash_reserve_usd", 5000))
 
     # clamp by position cap & max buy
-    for t in list(target.keys()):
-        px = float(prices.get(t, 0.0) or 0.0)
-        cur_val = float(current_values.get(t, 0.0) or 0.0)
-        room = max(0.0, max_pos_val - cur_val)
-        target[t] = min(target[t], max_buy, room)
-        if px <= 0:
-            target[t] = 0.0
+    room = np.maximum(0.0, max_pos_val - cur_val)
+    target = np.minimum(np.minimum(alloc_long * w, max_buy), room)
+    target[px <= 0] = 0.0
 
     # ensure cash buffer
-    total_buys = sum(target.values())
+    total_buys = float(target.sum())
     spare = max(0.0, cash_on_hand - min_cash_reserve)
     if total_buys > spare and total_buys > 0:
-        scale = spare / total_buys
-        target = {t: v * scale for t, v in target.items()}
+        target *= spare / total_buys
 
-    return target
+    return dict(zip(tickers, target.tolist()))
 
 def _build_tickets(signals: List[dict], target_dollars: Dict[str, float], prices: Dict[str, float]) -> List[dict]:
     tickets = []
@@ -149,6 +294,10 @@ def _build_tickets(signals: List[dict], target_dollars: Dict[str, float], prices
     return tickets
 
 # ---------- UI ----------
+# Fixed column orders for the signal/ticket records (also skips key inference)
+_SIGNAL_COLS = ["ticker", "action", "confidence", "reason"]
+_TICKET_COLS = ["ticker", "action", "qty", "est_price", "dollars", "reason"]
+
 def render_automation_tab():
     st.markdown("## 🤖 Automation (SOP)")
     st.caption("Loads SOP from strategy.yaml, fetches prices, generates signals, and sizes buys within risk guards.")
@@ -160,39 +309,59 @@ def render_automation_tab():
     long_term_pct = float(strat.get("allocations", {}).get("long_term_pct", 40))
 
     # Pull state from the main app if present
-    monthly_income = float(st.session_state.get("monthly_income", 0) or 0)
-    cash_on_hand = float(st.session_state.get("cash_on_hand", 0) or 0)
-    portfolio_value = float(st.session_state.get("total_portfolio_value", 0) or 0)
+    ss = st.session_state
+    monthly_income = float(ss.get("monthly_income", 0) or 0)
+    cash_on_hand = float(ss.get("cash_on_hand", 0) or 0)
+    portfolio_value = float(ss.get("total_portfolio_value", 0) or 0)
 
     st.write("**Universe**:", ", ".join(universe) if universe else "—")
-    st.write("**Cash on hand**: $", f"{cash_on_hand:,.2f}", " | **Portfolio**: $", f"{portfolio_value:,.2f}")
+    st.write("**Cash on hand**:", fmt_usd(cash_on_hand), " | **Portfolio**:", fmt_usd(portfolio_value))
 
-    # Prices
-    prices = {t: _get_stock_price(t) for t in universe}
-    st.dataframe(pd.DataFrame([{"Ticker": t, "Price": prices[t]} for t in universe]),
+    # Prices: reuse the 6mo history the signals need anyway; only symbols
+    # whose history came back empty fall through to the 1d download
+    with st.spinner("Fetching price history..."):
+        entries = dict(zip(universe, _map_tickers(_history_entry, universe)))
+    prices = {}
+    stale = set()
+    for t, (df, fresh) in entries.items():
+        if not df.empty and "close" in df:
+            close = df["close"].dropna()
+            if len(close):
+                prices[t] = float(close.to_numpy()[-1])
+                if not fresh:
+                    stale.add(t)
+    missing = tuple(sorted(set(universe) - prices.keys()))
+    if missing:
+        fallback, fallback_stale = _bulk_last_close(missing)
+        prices.update(fallback)
+        stale.update(fallback_stale)
+    price_col = np.fromiter((prices.get(t, 0.0) for t in universe), dtype=float, count=len(universe))
+    stale_col = np.fromiter((t in stale for t in universe), dtype=bool, count=len(universe))
+    st.dataframe(pd.DataFrame({"Ticker": universe, "Price": price_col, "Stale": stale_col}),
                  use_container_width=True, hide_index=True)
+    if stale:
+        st.warning("Stale cached prices for " + ", ".join(sorted(stale))
+                   + " (refreshing in the background); tickets below are sized on them.")
 
     # Current values from your core holdings table if you have it
     current_values = {}
-    core_df = st.session_state.get("core_holdings_df")
-    if isinstance(core_df, pd.DataFrame) and not core_df.empty:
-        for _, r in core_df.iterrows():
-            t = str(r.get("Ticker", "")).upper()
-            qty = float(r.get("Quantity", 0) or 0)
-            px = prices.get(t, 0.0)
-            current_values[t] = qty * px
+    core_df = ss.get("core_holdings_df")
+    if isinstance(core_df, pd.DataFrame) and not core_df.empty and "Ticker" in core_df:
+        tk = core_df["Ticker"].fillna("").astype(str).str.upper().to_numpy()
+        qty = pd.to_numeric(core_df.get("Quantity", pd.Series(0.0, index=core_df.index)),
+                            errors="coerce").fillna(0.0).to_numpy(dtype=float)
+        px = np.fromiter((prices.get(t, 0.0) for t in tk), dtype=float, count=len(tk))
+        current_values = dict(zip(tk.tolist(), (qty * px).tolist()))
     else:
         current_values = {t: 0.0 for t in universe}
 
     # Signals
     rules = strat.get("sop", {})
-    signals = []
-    for t in universe:
-        key = _key_for(t)
-        sig = _signal_for(t, rules.get(key, {"buy_if": []}))
-        signals.append(sig)
+    with st.spinner("Scoring signals..."):
+        signals = _map_tickers(lambda t: _signal_for(t, rules.get(_key_for(t), {"buy_if": []})), universe)
     st.write("### 📡 Signals")
-    st.dataframe(pd.DataFrame(signals), use_container_width=True, hide_index=True)
+    st.dataframe(pd.DataFrame.from_records(signals, columns=_SIGNAL_COLS),
+                 use_container_width=True, hide_index=True)
 
     # Targets + Tickets
     targets = _position_targets(
@@ -208,9 +377,9 @@ def render_automation_tab():
 
     st.write("### 🧾 Tickets (planned)")
     if tickets:
-        df_tix = pd.DataFrame(tickets)
+        df_tix = pd.DataFrame.from_records(tickets, columns=_TICKET_COLS)
         st.dataframe(df_tix, use_container_width=True, hide_index=True)
-        clip = " | ".join([f"{t['ticker']}: BUY {t['qty']} @ MKT (~${t['dollars']:,.0f})" for t in tickets])
+        clip = " | ".join([f"{t['ticker']}: BUY {t['qty']} @ MKT (~{fmt_usd(t['dollars'], 0)})" for t in tickets])
         st.text_area("Copy these orders:", value=clip, height=90)
     else:
         st.info("No BUY tickets generated at current prices/rules/cash.")
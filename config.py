@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+
 import streamlit as st
 
 # Environment label (prod by default)
@@ -12,10 +14,19 @@ ALLOCATION_RULES = {
     "real_estate_pct": 30,
 }
 
+# Money strings shared by the tabs
+def fmt_usd(value: float, decimals: int = 2) -> str:
+    """Dollar string with the sign ahead of the symbol: -$1,234.50"""
+    value = round(float(value), decimals)
+    sign = "-" if value < 0 else ""
+    return f"{sign}${abs(value):,.{decimals}f}"
+
+@lru_cache(maxsize=128)
 def get_secret(path: str, default: str | None = None):
     """
     Read nested secrets with 'section.key' syntax from st.secrets,
     then env vars as a fallback, else default.
+    Results are cached per process; restart the app after changing secrets.
     Example: get_secret("api.coinapi_key")
     """
     try:
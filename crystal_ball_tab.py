@@ -3,7 +3,10 @@ from datetime import datetime
 
 def render_crystal_ball_tab():
     st.markdown("### 🔮 Crystal Ball")
-    st.caption(f"Tab online at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    # stamped once per session; reruns reuse it instead of re-reading the clock
+    if "crystal_ball_online_at" not in st.session_state:
+        st.session_state["crystal_ball_online_at"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    st.caption(f"Tab online at {st.session_state['crystal_ball_online_at']}")
 
     st.info("Upload a chart screenshot here (we'll add analysis next).")
     up = st.file_uploader("Upload chart screenshot (PNG/JPG)", type=["png","jpg","jpeg"])
@@ -1,32 +1,56 @@
 # dashboard_tab.py
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from config import fmt_usd
+
+# Display-only formats, applied by the Styler without copying the frame
+_HOLDING_FORMATS = {"Cost Basis": fmt_usd}
+
+# Seed holdings as typed columns; the frame is assembled from them once
+_DEFAULT_TICKERS = np.array(["PLTR", "CRWD", "BTC", "XRP"], dtype=object)
+_DEFAULT_QTY = np.array([10, 5, 2, 100], dtype=np.float64)
+_DEFAULT_COST = np.array([15, 200, 30000, 0.5], dtype=np.float64)
+
+@st.cache_data
+def _build_portfolio_df() -> pd.DataFrame:
+    return pd.DataFrame({"Ticker": _DEFAULT_TICKERS, "Quantity": _DEFAULT_QTY, "Cost Basis": _DEFAULT_COST})
 
 def render_dashboard():
     st.title("📊 Portfolio Dashboard")
 
     # Sidebar inputs (monthly income, sliders, etc.)
     st.sidebar.header("Financial Inputs")
-    monthly_income = st.sidebar.number_input("Monthly Income ($)", min_value=0, step=100)
-    cash_on_hand = st.sidebar.number_input("Cash on Hand ($)", min_value=0, step=100)
-    long_term = st.sidebar.slider("Long Term Allocation (%)", 0, 100, 40)
-    short_term = st.sidebar.slider("Short Term Allocation (%)", 0, 100, 30)
-    real_estate = st.sidebar.slider("Real Estate Fund Allocation (%)", 0, 100, 30)
+    # The form holds edits until Apply, so dragging a slider is one rerun, not dozens.
+    with st.sidebar.form("financial_inputs"):
+        monthly_income = st.number_input("Monthly Income ($)", min_value=0, step=100)
+        cash_on_hand = st.number_input("Cash on Hand ($)", min_value=0, step=100)
+        long_term = st.slider("Long Term Allocation (%)", 0, 100, 40)
+        short_term = st.slider("Short Term Allocation (%)", 0, 100, 30)
+        real_estate = st.slider("Real Estate Fund Allocation (%)", 0, 100, 30)
+        st.form_submit_button("Apply")
+
+    st.write(f"**Monthly Income:** {fmt_usd(monthly_income)}")
+    st.write(f"**Cash on Hand:** {fmt_usd(cash_on_hand)}")
 
-    st.write(f"**Monthly Income:** ${monthly_income}")
-    st.write(f"**Cash on Hand:** ${cash_on_hand}")
+    _holdings_fragment()
 
+# Editing the table reruns only this fragment, not the sidebar or the Automation
+# tab. It publishes no state other tabs read, so nothing outside it goes stale.
+@st.fragment
+def _holdings_fragment():
     # Editable portfolio table
     st.subheader("📂 Portfolio Holdings")
-    default_data = {
-        "Ticker": ["PLTR", "CRWD", "BTC", "XRP"],
-        "Quantity": [10, 5, 2, 100],
-        "Cost Basis": [15, 200, 30000, 0.5]
-    }
-    df = pd.DataFrame(default_data)
+    ss = st.session_state
+    if "portfolio_df" not in ss:
+        ss["portfolio_df"] = _build_portfolio_df()
+    df = ss["portfolio_df"]
 
     edited_df = st.data_editor(df, num_rows="dynamic")
 
     # Show summary
     st.subheader("📈 Current Portfolio")
-    st.dataframe(edited_df)
+    # blank cells in rows added through the editor render as "—"
+    styler = edited_df.style.format(_HOLDING_FORMATS, na_rep="—")
+    st.dataframe(styler, use_container_width=True, hide_index=True)
@@ -1,32 +1,47 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import yaml
+import os
 import uuid
+from functools import lru_cache
+
+try:  # LibYAML C parser when PyYAML was built with it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+@lru_cache(maxsize=8)
+def _load_rules(config_path, mtime):
+    # mtime is part of the key so editing the file invalidates the entry
+    with open(config_path, "r") as f:
+        return yaml.load(f, Loader=_YamlLoader)
 
 class TradingEngine:
     def __init__(self, config_path):
-        with open(config_path, "r") as f:
-            self.rules = yaml.safe_load(f)
+        # Parsed once per file version and shared across instances; treat as read-only
+        self.rules = _load_rules(config_path, os.path.getmtime(config_path))
+        # Aligned once here so make_decision is a single vectorized compare
+        self.thresholds = pd.Series(self.rules.get("BUY_THRESHOLDS") or {}, dtype=float)
 
     def fetch_data(self):
-        tickers = self.rules["DEFAULT_TICKERS"]
-        data = {}
-        for t in tickers:
-            info = yf.Ticker(t).history(period="1d", interval="1m").tail(5)
-            data[t] = info["Close"].iloc[-1]
-        return pd.DataFrame.from_dict(data, orient="index", columns=["Price"])
+        tickers = list(self.rules["DEFAULT_TICKERS"])
+        # One multi-symbol request instead of a history() call per ticker
+        df = yf.download(tickers, period="1d", interval="1m", group_by="ticker",
+                         threads=True, progress=False)
+        if isinstance(df.columns, pd.MultiIndex):
+            close = df.xs("Close", level=1, axis=1)
+        else:
+            close = df[["Close"]].set_axis(tickers, axis=1)
+        # ffill so a ticker that stopped trading keeps its last print
+        last = close.ffill().iloc[-1].reindex(tickers).rename_axis(None)
+        return last.to_frame("Price")
 
     def make_decision(self, df):
-        # Example: Buy if price < buy_threshold
-        decisions = {}
-        for t in df.index:
-            price = df.loc[t, "Price"]
-            threshold = self.rules["BUY_THRESHOLDS"].get(t, None)
-            if threshold and price < threshold:
-                decisions[t] = "BUY"
-            else:
-                decisions[t] = "HOLD"
-        return decisions
+        # Example: Buy if price < buy_threshold (missing or zero threshold -> HOLD)
+        thr = self.thresholds.reindex(df.index)
+        buy = (df["Price"] < thr) & (thr != 0)
+        return dict(zip(df.index, np.where(buy, "BUY", "HOLD").tolist()))
 
     def execute_trade(self, decisions):
         # Fake ticket for now
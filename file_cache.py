@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+# Disk cache for Yahoo responses so cold starts don't re-hit the network.
+# Entries younger than `fresh_for` are served as-is; older ones (up to
+# `max_age`) are served stale while a background thread refreshes them.
+
+CACHE_DIR = os.getenv("APP_CACHE_DIR", ".cache")
+
+
+class FileCache:
+    def __init__(self, root: str = CACHE_DIR, fresh_for: float = 300, max_age: float = 90 * 86400):
+        self.root = root
+        self.fresh_for = fresh_for
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._inflight = set()
+
+    def _path(self, ticker: str, endpoint: str, params: dict) -> str:
+        digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker)
+        return os.path.join(self.root, safe, f"{endpoint}_{digest}.json")
+
+    def lookup(self, ticker: str, endpoint: str, params: dict) -> Optional[Tuple[Any, bool]]:
+        """Return (data, is_fresh), or None on a miss / expired entry."""
+        try:
+            with open(self._path(ticker, endpoint, params), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        age = time.time() - float(entry.get("ts", 0))
+        if age > self.max_age:
+            return None
+        return entry.get("data"), age <= self.fresh_for
+
+    def store(self, ticker: str, endpoint: str, params: dict, data: Any) -> None:
+        path = self._path(ticker, endpoint, params)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"ts": time.time(), "data": data}, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def revalidate(self, key: Any, refresh: Callable[[], None]) -> None:
+        """Run `refresh` on a daemon thread unless one is already running for `key`."""
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight.add(key)
+
+        def _run():
+            try:
+                refresh()
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._inflight.discard(key)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def fetch(self, ticker: str, endpoint: str, params: dict, loader: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Cached call of `loader()` as (data, is_fresh); a loader returning None is a failed fetch."""
+        hit = self.lookup(ticker, endpoint, params)
+        if hit is not None:
+            data, fresh = hit
+            if not fresh:
+                def _refresh():
+                    fresh_data = loader()
+                    if fresh_data is not None:
+                        self.store(ticker, endpoint, params, fresh_data)
+                self.revalidate((ticker, endpoint, json.dumps(params, sort_keys=True)), _refresh)
+            return data, fresh
+        data = loader()
+        if data is not None:
+            self.store(ticker, endpoint, params, data)
+        return data, True
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Page configuration
@@ -10,68 +12,102 @@ st.set_page_config(
     layout="wide"
 )
 
+# Concurrent option_chain requests per ticker
+CHAIN_WORKERS = 8
+
+# Calls columns kept when flattening, the subset carried into scoring, and the scored frame's order
+CALL_COLS = ["contractSymbol", "strike", "lastPrice", "impliedVolatility", "volume", "openInterest", "delta", "inTheMoney"]
+SCORED_SOURCE_COLS = ["contractSymbol", "strike", "expiration", "lastPrice", "impliedVolatility", "volume", "openInterest", "delta"]
+SCORED_COLS = ["contractSymbol", "strike", "expiration", "lastPrice", "IV", "volume", "openInterest", "delta", "score"]
+
+# Function to list expiration dates with caching
+@st.cache_data(ttl=300, show_spinner=False)
+def get_expirations(ticker_symbol):
+    """Expiration dates only, without downloading any chains"""
+    try:
+        return tuple(yf.Ticker(ticker_symbol).options)
+    except Exception as e:
+        st.error(f"Failed to load expirations for {ticker_symbol}: {e}")
+        return ()
+
 # Function to load option chains with caching
-@st.cache_data
+@st.cache_data(ttl=300, show_spinner=False)
 def load_option_chain(ticker_symbol):
-    """Load option chain data for a given ticker with caching"""
+    """Load option chain data for a given ticker, plus its scored calls, with caching"""
     ticker = yf.Ticker(ticker_symbol)
     try:
         expirations = ticker.options
-        options_data = {}
-        for date in expirations:
-            calls = ticker.option_chain(date).calls
-            puts = ticker.option_chain(date).puts
-            options_data[date] = {"calls": calls, "puts": puts}
-        return options_data
+        # One request per expiration (not one each for calls and puts), issued concurrently
+        with ThreadPoolExecutor(max_workers=CHAIN_WORKERS) as ex:
+            chains = list(ex.map(ticker.option_chain, expirations))
+        # Only the screener's call columns are cached; reindex keeps delta (never sent by Yahoo) as NaN
+        options_data = {date: {"calls": chain.calls.reindex(columns=CALL_COLS)} for date, chain in zip(expirations, chains)}
     except Exception as e:
         st.error(f"Failed to load options data for {ticker_symbol}: {e}")
-        return {}
+        return {}, pd.DataFrame(columns=SCORED_COLS)
+    # Scored in the same cache entry, so chains and scores always come from one snapshot
+    return options_data, filter_and_score_options(flatten_calls(options_data))
+
+# Function to flatten option chains
+def flatten_calls(options_data):
+    """All expirations' calls in one frame tagged with their expiration"""
+    # already projected to CALL_COLS by load_option_chain
+    frames = [chains["calls"] for chains in options_data.values()]
+    if not frames:
+        return pd.DataFrame()
+    # one np.concatenate per needed column instead of concatenating whole frames
+    columns = {col: np.concatenate([f[col].to_numpy() for f in frames]) for col in CALL_COLS}
+    columns["expiration"] = np.repeat(list(options_data.keys()), [len(f) for f in frames])
+    return pd.DataFrame(columns)
 
 # Function to filter and score options
-def filter_and_score_options(options_data):
+def filter_and_score_options(calls):
     """Filter and score options contracts based on multiple criteria"""
-    scored_contracts = []
-
-    for exp_date, chains in options_data.items():
-        calls = chains["calls"]
-
-        # Filter for out-of-the-money calls with reasonable IV and liquidity
-        filtered = calls[
-            (calls["inTheMoney"] == False) &
-            (calls["impliedVolatility"] < 1.0) &  # remove crazy IVs
-            (calls["volume"] > 10) &
-            (calls["openInterest"] > 50)
-        ]
-
-        for _, row in filtered.iterrows():
-            # Calculate composite score based on volume/OI ratio, IV, and delta
-            score = (
-                (row["volume"] / row["openInterest"]) * 0.4 +
-                (1 - row["impliedVolatility"]) * 0.3 +
-                (1 - abs(0.5 - row["delta"])) * 0.3
-            )
-            scored_contracts.append({
-                "contractSymbol": row["contractSymbol"],
-                "strike": row["strike"],
-                "expiration": exp_date,
-                "lastPrice": row["lastPrice"],
-                "IV": row["impliedVolatility"],
-                "volume": row["volume"],
-                "openInterest": row["openInterest"],
-                "delta": row["delta"],
-                "score": round(score, 4)
-            })
-
-    df = pd.DataFrame(scored_contracts)
-    return df.sort_values("score", ascending=False)
-
-# Function to get stock price
+    if calls.empty:
+        return pd.DataFrame(columns=SCORED_COLS)
+
+    # Filter for out-of-the-money calls with reasonable IV and liquidity
+    filtered = calls[
+        (calls["inTheMoney"] == False) &
+        (calls["impliedVolatility"] < 1.0) &  # remove crazy IVs
+        (calls["volume"] > 10) &
+        (calls["openInterest"] > 50)
+    ]
+
+    # Composite score based on volume/OI ratio, IV, and delta, as column arithmetic
+    score = (
+        (filtered["volume"] / filtered["openInterest"]) * 0.4 +
+        (1 - filtered["impliedVolatility"]) * 0.3
+    )
+    # Yahoo chains carry no delta; score on the other two terms rather than NaN every row
+    if filtered["delta"].notna().any():
+        score = score + (1 - (0.5 - filtered["delta"]).abs()) * 0.3
+    df = filtered[SCORED_SOURCE_COLS].rename(columns={"impliedVolatility": "IV"}).assign(score=score.round(4))
+    return df[SCORED_COLS].sort_values("score", ascending=False)
+
+# Function to bin a column for st.bar_chart
+def histogram_frame(values, bins=20):
+    """Counts per bin, indexed by bin midpoint, ignoring missing values"""
+    values = pd.Series(values).dropna().to_numpy(dtype=float)
+    counts, edges = np.histogram(values, bins=bins)
+    midpoints = np.round((edges[:-1] + edges[1:]) / 2, 3)
+    return pd.DataFrame({"count": counts}, index=pd.Index(midpoints, name="bin"))
+
+# Function to get stock price with caching
+@st.cache_data(ttl=60, show_spinner=False)
 def get_stock_price(symbol):
     """Get stock price from yfinance"""
     try:
         ticker = yf.Ticker(symbol)
-        info = ticker.info
-        return info.get('regularMarketPrice', None)
+        # fast_info is a small quote payload; .info pulls the whole profile blob
+        try:
+            price = ticker.fast_info["last_price"]
+        except Exception:
+            price = None
+        if price is None or pd.isna(price):
+            close = ticker.history(period="1d")["Close"]
+            price = close.to_numpy()[-1] if len(close) else None
+        return float(price) if price is not None else None
     except Exception as e:
         st.error(f"Error fetching {symbol} price: {str(e)}")
         return None
@@ -112,9 +148,9 @@ with col2:
             st.metric("Current Price", f"${current_price:.2f}")
             
             # Calculate days to next expiration
-            options_data = load_option_chain(ticker.upper())
-            if options_data:
-                next_exp = min(options_data.keys())
+            expirations = get_expirations(ticker.upper())
+            if expirations:
+                next_exp = min(expirations)
                 exp_date = datetime.strptime(next_exp, '%Y-%m-%d').date()
                 days_to_exp = (exp_date - datetime.now().date()).days
                 st.metric("Days to Next Exp", days_to_exp)
@@ -125,22 +161,24 @@ with col2:
 if st.button("🚀 Load & Analyze Options", type="primary"):
     if ticker:
         with st.spinner("Loading options data..."):
-            raw_data = load_option_chain(ticker.upper())
+            raw_data, scored_df = load_option_chain(ticker.upper())
 
         if raw_data:
             st.success(f"✅ Data loaded for {ticker.upper()}!")
             
-            # Get scored options
-            scored_df = filter_and_score_options(raw_data)
-            
             if not scored_df.empty:
                 # Apply additional filters
-                filtered_df = scored_df[
+                has_delta = scored_df['delta'].notna().any()
+                mask = (
                     (scored_df['volume'] >= min_volume) &
                     (scored_df['openInterest'] >= min_oi) &
-                    (scored_df['IV'] <= max_iv / 100) &
-                    (scored_df['delta'] >= min_delta)
-                ]
+                    (scored_df['IV'] <= max_iv / 100)
+                )
+                if has_delta:
+                    mask &= scored_df['delta'] >= min_delta
+                else:
+                    st.info("Delta is not available for this chain; the Min Delta filter is skipped.")
+                filtered_df = scored_df[mask]
                 
                 if not filtered_df.empty:
                     # Display results
@@ -175,7 +213,7 @@ if st.button("🚀 Load & Analyze Options", type="primary"):
                         st.metric("Avg Score", f"{avg_score:.3f}")
                     with col4:
                         avg_delta = filtered_df['delta'].mean()
-                        st.metric("Avg Delta", f"{avg_delta:.3f}")
+                        st.metric("Avg Delta", f"{avg_delta:.3f}" if has_delta else "—")
                     
                     # Expiration analysis
                     st.subheader("📅 Expiration Analysis")
@@ -202,19 +240,22 @@ if 'scored_df' in locals() and not scored_df.empty:
         st.subheader("📈 IV Distribution")
         if not scored_df.empty:
             iv_data = scored_df['IV'] * 100
-            st.histogram_chart(iv_data)
+            st.bar_chart(histogram_frame(iv_data))
     
     with tab2:
         st.subheader("📊 Delta Distribution")
         if not scored_df.empty:
             delta_data = scored_df['delta']
-            st.histogram_chart(delta_data)
+            if delta_data.notna().any():
+                st.bar_chart(histogram_frame(delta_data))
+            else:
+                st.caption("No delta values in this chain")
     
     with tab3:
         st.subheader("💰 Price Distribution")
         if not scored_df.empty:
             price_data = scored_df['lastPrice']
-            st.histogram_chart(price_data)
+            st.bar_chart(histogram_frame(price_data))
 
 # Footer
 st.markdown("---")